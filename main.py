@@ -1,29 +1,54 @@
 import config as config
-import json
 import numpy as np
-import redis
+import redis.asyncio as aioredis
 from catsim.estimation import *  # estimation package contains different proficiency estimation methods
 from catsim.initialization import *  # initialization package contains different initial proficiency estimation strategies
 from catsim.selection import *  # selection package contains different item selection strategies
 from catsim.stopping import *  # stopping package contains different stopping criteria for the CAT
-from distutils.util import strtobool
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from functools import lru_cache
+from pydantic import BaseModel, conint
 from typing import List, Optional
 
 CATModule = FastAPI()  # Used for REST API
 
-r = redis.Redis(  # Used for DataStorage
+r = aioredis.Redis(  # Used for DataStorage, non-blocking so that waiting for Redis does not block the event loop
     host=config.redis["host"],
     port=config.redis["port"],
     db=config.redis["db"],
     password=config.redis["password"]
 )
 
+# Lua scripts executed on the Redis server, so that a question step only needs one call for loading and one for saving
+fetch_state = r.register_script("""
+return {redis.call('HGETALL', KEYS[1]),
+        redis.call('GET', KEYS[2]),
+        redis.call('GET', KEYS[3]),
+        redis.call('LRANGE', KEYS[4], 0, -1),
+        redis.call('GET', KEYS[5])}
+""")  # KEYS: quiz hash, items_blob, questionIds_blob, administeredItems, responses_blob
+
+commit_step = r.register_script("""
+if redis.call('LLEN', KEYS[2]) ~= tonumber(ARGV[1]) or redis.call('STRLEN', KEYS[3]) ~= tonumber(ARGV[2]) then
+    return 0
+end
+if ARGV[3] ~= '' then
+    redis.call('APPEND', KEYS[3], ARGV[3])
+end
+if ARGV[4] ~= '' then
+    redis.call('RPUSH', KEYS[2], ARGV[4])
+end
+if #ARGV > 4 then
+    redis.call('HSET', KEYS[1], unpack(ARGV, 5))
+end
+return 1
+""")  # KEYS: quiz hash, administeredItems, responses_blob; ARGV: administeredItems length and responses_blob size read by the request, packed response, administered item, followed by hash field/value pairs
+# Returns 0 without writing anything if the quiz was changed by another request since its state was loaded
+
 
 # Question object for API --> used for quiz creation
 class QuestionAPI(BaseModel):
-    id: int
+    id: conint(ge=-2 ** 63, le=2 ** 63 - 1)  # question ids are stored as int64 values
     discrimination: Optional[float] = 1.0
     difficulty: float
     pseudoGuessing: Optional[float] = 0.0
@@ -85,8 +110,8 @@ async def api_create_quiz(quizAPI: QuizAPI):
     - **maxNumberOfQuestions**: The maximum amount of questions for the quiz. This will be used as a stopping criteria for the exam.
     - **minMeasurementAccuracy**: The threshold for the Standard Error of Estimation. This will be used as a stopping criteria for the exam.
     - **questionSelector**: Defines how the next question is selected. 'maxInfoSelector' represents the Maximum Information Selector (https://douglasrizzo.com.br/catsim/selection.html#catsim.selection.MaxInfoSelector) for adaptive quizzes. This is also the default.
-    - **competencyEstimator**: Defines how the competency is calculated. 'differentialEvolutionEstimator' is the default Estimator, no others are currently implemented.
-    - **questions**: List of **possible quiz questions** containing their id and configuration (discrimination, difficulty, pseudoGuessing, upperAsymptote). id and difficulty are the only non-optional parameters. Example Value: {"id":1,"difficulty": -1.760337722}
+    - **competencyEstimator**: Defines how the competency is calculated. 'hillClimbingEstimator' represents the Hill Climbing Estimator (https://douglasrizzo.com.br/catsim/estimation.html#catsim.estimation.HillClimbingEstimator). 'differentialEvolutionEstimator' is still accepted and uses the Hill Climbing Estimator as well.
+    - **questions**: List of **possible quiz questions** containing their id and configuration (discrimination, difficulty, pseudoGuessing, upperAsymptote). id and difficulty are the only non-optional parameters, the id must fit into a signed 64-bit integer. Example Value: {"id":1,"difficulty": -1.760337722}
 
     Example request body to create an adaptive quiz:<br>
     {<br>
@@ -121,7 +146,7 @@ async def api_create_quiz(quizAPI: QuizAPI):
     - **Other**: The other contents of the response represent the configuration of the quiz
     """
     # TODO validate maxNumberOfQuestions -> It must be less or equal than the number of given questions
-    return create_quiz(quizAPI)
+    return await create_quiz(quizAPI)
 
 
 @CATModule.get("/quiz/question", summary="Get the next question of quiz with ID", tags=["question"])
@@ -138,12 +163,13 @@ async def api_get_next_question(answer: AnswerAPI):
     - **measurementAccuracy**: Standard Estimation Error of the current competency.
     - **currentCompetency**: Describes the proficiency of the examinee.
     - **quizFinished**: True if the quiz is already finished.
+    Status 409 Conflict if another answer for the same quiz was processed while this request was running. Nothing is saved in that case, so the request can be retried.
     """
-    if (not (quizIdExists(answer.quizId))):
+    if (not (await quizIdExists(answer.quizId))):
         raise HTTPException(status_code=404, detail="Quiz with id " + str(answer.quizId) + " not found!")
-    if (strtobool(r.get(get_rPrefix(answer.quizId) + "quizFinished").decode())):
+    if (bool(int(await r.hget(get_rHashKey(answer.quizId), "quizFinished")))):
         raise HTTPException(status_code=406, detail="No more questions for quiz with id " + str(answer.quizId) + "!")
-    return (get_next_question(answer))
+    return (await get_next_question(answer))
 
 
 @CATModule.get("/quiz/result", summary="Get the result of quiz with ID", tags=["result"])
@@ -162,13 +188,13 @@ async def api_get_result(quizIdAPI: QuizIdAPI):
     - **responses**: An ordered list of the responses to the administered questions.
     - **maxNumberOfQuestions**: The maximum number of questions the quiz could have had.
     """
-    if (not (quizIdExists(quizIdAPI.quizId))):
+    if (not (await quizIdExists(quizIdAPI.quizId))):
         raise HTTPException(status_code=404, detail="Quiz with id " + str(quizIdAPI.quizId) + " not found!")
-    if r.get(get_rPrefix(quizIdAPI.quizId) + "questionSelector").decode("utf-8") == 'linearSelector' and (
-            not (strtobool(r.get(get_rPrefix(quizIdAPI.quizId) + "quizFinished").decode()))):
+    questionSelector, quizFinished = await r.hmget(get_rHashKey(quizIdAPI.quizId), "questionSelector", "quizFinished")
+    if questionSelector.decode("utf-8") == 'linearSelector' and (not (bool(int(quizFinished)))):
         raise HTTPException(status_code=406,
                             detail="Quiz with id " + str(quizIdAPI.quizId) + " has not been finished yet!")
-    return (get_result(quizIdAPI))
+    return (await get_result(quizIdAPI))
 
 
 @CATModule.delete("/quiz", summary="Delete quiz with ID", tags=["quiz"])
@@ -181,9 +207,9 @@ async def api_delete_quiz(quizIdAPI: QuizIdAPI):
     Response:
     Status 200 OK if the quiz was successfully deleted.
     """
-    if (not (quizIdExists(quizIdAPI.quizId))):
+    if (not (await quizIdExists(quizIdAPI.quizId))):
         raise HTTPException(status_code=404, detail="Quiz with id " + str(quizIdAPI.quizId) + " not found!")
-    delete_quiz(quizIdAPI)
+    await delete_quiz(quizIdAPI)
     return ("Quiz with id " + str(quizIdAPI.quizId) + " was successfully deleted!")
 
 
@@ -194,151 +220,181 @@ async def get_status200():
 
 # --------------- Functionality ---------------
 
-def create_quiz(quizAPI):  # Save the quiz in Redis
-    quizAPI.quizId = id(quizAPI)  # create unique quizID
-
-    # Save Data recieved from Call to Redis
-    r.mset({get_rPrefix(quizAPI.quizId) + "maxNumberOfQuestions": quizAPI.maxNumberOfQuestions,
-            get_rPrefix(quizAPI.quizId) + "minMeasurementAccuracy": quizAPI.minMeasurementAccuracy,
-            get_rPrefix(quizAPI.quizId) + "inputProficiencyLevel": quizAPI.inputProficiencyLevel,
-            get_rPrefix(quizAPI.quizId) + "questionSelector": quizAPI.questionSelector,
-            get_rPrefix(quizAPI.quizId) + "competencyEstimator": quizAPI.competencyEstimator,
-            get_rPrefix(quizAPI.quizId) + "standardErrorOfEstimation": config.defaultAdaptiveQuiz["standardErrorOfEstimation"],
-            get_rPrefix(quizAPI.quizId) + "quizFinished": str(False)
-            })
-
-    for question in quizAPI.questions:  # Store questions in Redis
-        r.rpush(get_rPrefix(quizAPI.quizId) + "questions", json.dumps(question.__dict__))
+async def create_quiz(quizAPI):  # Save the quiz in Redis
+    quizAPI.quizId = await r.incr("quiz:counter")  # create unique quizID
+
+    # Save Data recieved from Call to Redis, all commands are sent with a single round-trip
+    pipe = r.pipeline(transaction=False)
+    pipe.hset(get_rHashKey(quizAPI.quizId), mapping={"maxNumberOfQuestions": quizAPI.maxNumberOfQuestions,
+                                                     "minMeasurementAccuracy": quizAPI.minMeasurementAccuracy,
+                                                     "inputProficiencyLevel": quizAPI.inputProficiencyLevel,
+                                                     "questionSelector": quizAPI.questionSelector,
+                                                     "competencyEstimator": quizAPI.competencyEstimator,
+                                                     "standardErrorOfEstimation": config.defaultAdaptiveQuiz["standardErrorOfEstimation"],
+                                                     "quizFinished": 0  # stored as integer flag
+                                                     })
+
+    # Store the questions in the catsim format as packed binary arrays, so they can be loaded without parsing
+    items = np.array([[question.discrimination, question.difficulty, question.pseudoGuessing, question.upperAsymptote]
+                      for question in quizAPI.questions], dtype=np.float64).reshape(-1, 4)
+    questionIds = np.array([question.id for question in quizAPI.questions], dtype=np.int64)
+    pipe.mset({get_rPrefix(quizAPI.quizId) + "items_blob": items.tobytes(),
+               get_rPrefix(quizAPI.quizId) + "questionIds_blob": questionIds.tobytes()
+               })
 
     # Initialization Initializer (If InputProficiencyLevel is 99.9, a random difficulty will be chosen.)
-    init_initializer(quizAPI)
-
-    # Initialization DifferentialEvolutionEstimator
-    init_estimator(quizAPI)
+    init_initializer(quizAPI, pipe)
 
     # Selector specific initializations
-    init_selector(quizAPI)
+    init_selector(quizAPI, pipe)
 
-    r.rpush("quizIds", quizAPI.quizId)
+    pipe.sadd("quizIdSet", quizAPI.quizId)  # added last, so the quiz can only be found once it is completely stored
+    await pipe.execute()
 
     return (quizAPI)
 
 
-def get_next_question(answer: AnswerAPI):  # Calculate the next quiz question
+async def get_next_question(answer: AnswerAPI):  # Calculate the next quiz question
+    # Load the quiz state with a single call to Redis
+    quizDataRaw, itemsBlob, questionIdsBlob, administeredItemsJSON, responsesBlob = await fetch_state(
+        keys=get_quizStateKeys(answer.quizId))
+    quizData = parse_quizData(dict(zip(quizDataRaw[::2], quizDataRaw[1::2])))
+    loadedResponsesSize = len(responsesBlob or b"")  # used to detect concurrent answers when saving
+
     # Load Questions
-    items = get_items(answer.quizId)
-    administered_items = get_administeredItems(answer.quizId)
+    items = parse_items(itemsBlob)
+    questionIds = parse_questionIds(questionIdsBlob)
+    administered_items = parse_administeredItems(administeredItemsJSON)
     # Define Stopping Criterion
-    minErrorStopper = MinErrorStopper(float(r.get(get_rPrefix(answer.quizId) + "minMeasurementAccuracy")))  # Describes the measurement accuracy threshold of the exam --> standard error of estimation is used.
-    maxItemStopper = MaxItemStopper(int(r.get(get_rPrefix(answer.quizId) + "maxNumberOfQuestions")))
+    minErrorStopper = MinErrorStopper(float(quizData["minMeasurementAccuracy"]))  # Describes the measurement accuracy threshold of the exam --> standard error of estimation is used.
+    maxItemStopper = MaxItemStopper(int(quizData["maxNumberOfQuestions"]))
 
-    selector = get_selector(answer.quizId)
+    selector = get_selector(quizData["questionSelector"], len(items))
 
+    # All writes of this step are collected and saved with a single call at the end
+    newResponse = ""
+    newAdministeredItem = ""
+    quizDataUpdate = {}
     if len(administered_items) == 0:  # Select first question and deliver it
-        itemIndex = selector.select(items=get_items(answer.quizId), # maps cat-sim index to question id
+        itemIndex = selector.select(items=items, # maps cat-sim index to question id
                                     administered_items=administered_items, # all answered questions
-                                    est_theta=float(r.get(get_rPrefix(answer.quizId) + "estTheta"))) # est_theta is the current compentce level
-        r.set(get_rPrefix(answer.quizId) + "itemIndex", int(itemIndex))
+                                    est_theta=float(quizData["estTheta"])) # est_theta is the current compentce level
+        quizDataUpdate["itemIndex"] = int(itemIndex)
 
         nextQuestion = NextQuestionAPI(quizId=answer.quizId,
-                                       questionId=get_questionId_by_index(answer.quizId, itemIndex),
-                                       measurementAccuracy=float(r.get(get_rPrefix(answer.quizId) + "standardErrorOfEstimation")),
-                                       currentCompetency=(float(r.get(get_rPrefix(answer.quizId) + "estTheta"))),
-                                       quizFinished=strtobool(r.get(get_rPrefix(answer.quizId) + "quizFinished").decode()))
-        r.rpush(get_rPrefix(answer.quizId) + "administeredItems", int(itemIndex))
+                                       questionId=questionIds[itemIndex],
+                                       measurementAccuracy=float(quizData["standardErrorOfEstimation"]),
+                                       currentCompetency=float(quizData["estTheta"]),
+                                       quizFinished=bool(int(quizData["quizFinished"])))
+        newAdministeredItem = int(itemIndex)
     elif answer.isCorrect != None and answer.isCorrect >= 0.0 and answer.isCorrect <= 1.0:  # Check if input is okay -> TODO move to API method and throw HTTPException if value is wrong
-        r.rpush(get_rPrefix(answer.quizId) + "responses", answer.isCorrect)  # Add response to List
+        newResponse = np.float64(answer.isCorrect).tobytes()  # Add response to the packed responses
+        responsesBlob = (responsesBlob or b"") + newResponse
 
-        estimator = get_estimator(answer.quizId)
+        estimator = get_estimator(quizData["competencyEstimator"])
 
         estTheta = estimator.estimate(items=items,
                                       administered_items=administered_items,
-                                      response_vector=get_responses(answer.quizId),
-                                      est_theta=float(r.get(get_rPrefix(answer.quizId) + "estTheta")))
-        r.set(get_rPrefix(answer.quizId) + "estTheta", estTheta)
-
-        standardErrorOfEstimation = irt.see(theta=estTheta, items=items[administered_items])
-        r.set(get_rPrefix(answer.quizId) + "standardErrorOfEstimation", standardErrorOfEstimation)
-
-        quizFinished = (minErrorStopper.stop(administered_items=items[administered_items], theta=estTheta) or (maxItemStopper.stop(administered_items=items[administered_items])))
-        r.set(get_rPrefix(answer.quizId) + "quizFinished", str(quizFinished))
+                                      response_vector=parse_responses(responsesBlob),
+                                      est_theta=float(quizData["estTheta"]))
+        administeredQuestionItems = items[administered_items]  # copy of the answered questions, shared by the calculations below
+        standardErrorOfEstimation = irt.see(theta=estTheta, items=administeredQuestionItems)
+        quizFinished = (minErrorStopper.stop(administered_items=administeredQuestionItems, theta=estTheta) or (maxItemStopper.stop(administered_items=administeredQuestionItems)))
+        quizDataUpdate.update({"estTheta": float(estTheta),
+                               "standardErrorOfEstimation": float(standardErrorOfEstimation),
+                               "quizFinished": int(quizFinished)
+                               })
 
         if (not (quizFinished)):
-            itemIndex = selector.select(items=get_items(answer.quizId),
+            itemIndex = selector.select(items=items,
                                         administered_items=administered_items,
                                         est_theta=estTheta)
-            r.set(get_rPrefix(answer.quizId) + "itemIndex", int(itemIndex))
+            quizDataUpdate["itemIndex"] = int(itemIndex)
 
             nextQuestion = NextQuestionAPI(quizId=answer.quizId,
-                                           questionId=get_questionId_by_index(answer.quizId, itemIndex),
+                                           questionId=questionIds[itemIndex],
                                            measurementAccuracy=standardErrorOfEstimation,
                                            currentCompetency=estTheta,
                                            quizFinished=quizFinished)
-            r.rpush(get_rPrefix(answer.quizId) + "administeredItems", int(itemIndex))
+            newAdministeredItem = int(itemIndex)
         else: # if quiz is already finished return no new questionId
             nextQuestion = NextQuestionAPI(quizId=answer.quizId,
                                            questionId=None,
                                            measurementAccuracy=standardErrorOfEstimation,
                                            currentCompetency=estTheta,
                                            quizFinished=quizFinished)
+    committed = await commit_step(keys=[get_rHashKey(answer.quizId),
+                                        get_rPrefix(answer.quizId) + "administeredItems",
+                                        get_rPrefix(answer.quizId) + "responses_blob"],
+                                  args=[len(administered_items), loadedResponsesSize, newResponse, newAdministeredItem]
+                                       + [value for field in quizDataUpdate.items() for value in field])
+    if not committed:  # another request for this quiz was processed in the meantime
+        raise HTTPException(status_code=409, detail="Quiz with id " + str(answer.quizId) + " was changed by another request, please retry!")
     return (nextQuestion)
 
 
-def get_result(quizIdAPI: QuizIdAPI):
-    if r.get(get_rPrefix(quizIdAPI.quizId) + "questionSelector").decode("utf-8") == 'linearSelector': #get the result of a non-adaptive quiz
-        responses = get_responses_as_float(quizIdAPI.quizId)
-        r.set(get_rPrefix(quizIdAPI.quizId) + "standardErrorOfEstimation", 0.0)
-        #needed to calculate percentage of correct answers
-        achievablePoints = 0.0
-        achievedPoints = 0.0
-        i = 0
+async def get_result(quizIdAPI: QuizIdAPI):
+    quizData = await get_quizData(quizIdAPI.quizId)
+    if quizData["questionSelector"] == 'linearSelector': #get the result of a non-adaptive quiz
+        responses = await get_responses_as_float(quizIdAPI.quizId)
         administeredQuestions: List[QuestionAPI] = []  # create list of quiz questions with their real questionID.
-        for itemIndex in get_administeredItems(quizIdAPI.quizId):
-            item = get_item_by_index(quizIdAPI.quizId, itemIndex)
-            questionAPI = QuestionAPI(id=get_questionId_by_index(quizIdAPI.quizId, itemIndex), discrimination=item[0],
+        itemsBlob, questionIdsBlob = await r.mget(get_rPrefix(quizIdAPI.quizId) + "items_blob",
+                                                  get_rPrefix(quizIdAPI.quizId) + "questionIds_blob")
+        items = parse_items(itemsBlob)
+        questionIds = parse_questionIds(questionIdsBlob)
+        administeredItems = await get_administeredItems(quizIdAPI.quizId)
+        for itemIndex in administeredItems:
+            item = items[itemIndex]
+            questionAPI = QuestionAPI(id=questionIds[itemIndex], discrimination=item[0],
                                       difficulty=item[1], pseudoGuessing=item[2], upperAsymptote=item[3])
             administeredQuestions.append(questionAPI)
-            achievablePoints = achievablePoints + item[1]
-            achievedPoints = achievedPoints + item[1] * responses[i]
-            i = i + 1
-        r.set(get_rPrefix(quizIdAPI.quizId) + "estTheta", achievedPoints / achievablePoints)
+        #needed to calculate percentage of correct answers, every question is weighted by its difficulty
+        difficulties = items[administeredItems, 1]
+        achievablePoints = difficulties.sum()
+        achievedPoints = (difficulties * responses).sum()
+        quizData["estTheta"] = float(achievedPoints / achievablePoints)  # NumPy division: nan/inf instead of an exception if the difficulties sum up to 0
+        quizData["standardErrorOfEstimation"] = 0.0
+        await r.hset(get_rHashKey(quizIdAPI.quizId), mapping={"estTheta": quizData["estTheta"],
+                                                              "standardErrorOfEstimation": quizData["standardErrorOfEstimation"]
+                                                              })
         result = ResultAPI(quizId=quizIdAPI.quizId,
-                           quizFinished=strtobool(r.get(get_rPrefix(quizIdAPI.quizId) + "quizFinished").decode()),
-                           currentCompetency=float(r.get(get_rPrefix(quizIdAPI.quizId) + "estTheta")),
-                           measurementAccuracy=float(r.get(get_rPrefix(quizIdAPI.quizId) + "standardErrorOfEstimation")),
+                           quizFinished=bool(int(quizData["quizFinished"])),
+                           currentCompetency=float(quizData["estTheta"]),
+                           measurementAccuracy=float(quizData["standardErrorOfEstimation"]),
                            administeredQuestions=administeredQuestions,
-                           responses=get_responses_as_float(quizIdAPI.quizId).tolist(),
-                           maxNumberOfQuestions=int(r.get(get_rPrefix(quizIdAPI.quizId) + "maxNumberOfQuestions")))
+                           responses=responses.tolist(),
+                           maxNumberOfQuestions=int(quizData["maxNumberOfQuestions"]))
     else: #get the result of an adaptive quiz
         administeredQuestions: List[QuestionAPI] = []  # create list of quiz questions with their real questionID.
-        for itemIndex in get_administeredItems(quizIdAPI.quizId):
-            item = get_item_by_index(quizIdAPI.quizId, itemIndex)
-            questionAPI = QuestionAPI(id=get_questionId_by_index(quizIdAPI.quizId, itemIndex), discrimination=item[0],
+        itemsBlob, questionIdsBlob = await r.mget(get_rPrefix(quizIdAPI.quizId) + "items_blob",
+                                                  get_rPrefix(quizIdAPI.quizId) + "questionIds_blob")
+        items = parse_items(itemsBlob)
+        questionIds = parse_questionIds(questionIdsBlob)
+        for itemIndex in await get_administeredItems(quizIdAPI.quizId):
+            item = items[itemIndex]
+            questionAPI = QuestionAPI(id=questionIds[itemIndex], discrimination=item[0],
                                       difficulty=item[1], pseudoGuessing=item[2], upperAsymptote=item[3])
             administeredQuestions.append(questionAPI)
         result = ResultAPI(quizId=quizIdAPI.quizId,
-                           quizFinished=strtobool(r.get(get_rPrefix(quizIdAPI.quizId) + "quizFinished").decode()),
-                           currentCompetency=float(r.get(get_rPrefix(quizIdAPI.quizId) + "estTheta")),
-                           measurementAccuracy=float(r.get(get_rPrefix(quizIdAPI.quizId) + "standardErrorOfEstimation")),
+                           quizFinished=bool(int(quizData["quizFinished"])),
+                           currentCompetency=float(quizData["estTheta"]),
+                           measurementAccuracy=float(quizData["standardErrorOfEstimation"]),
                            administeredQuestions=administeredQuestions,
-                           responses=get_responses_as_float(quizIdAPI.quizId).tolist(),
-                           maxNumberOfQuestions=int(r.get(get_rPrefix(quizIdAPI.quizId) + "maxNumberOfQuestions")))
+                           responses=(await get_responses_as_float(quizIdAPI.quizId)).tolist(),
+                           maxNumberOfQuestions=int(quizData["maxNumberOfQuestions"]))
     return result
 
 
-def delete_quiz(quizIdAPI):
-    r.delete(get_rPrefix(quizIdAPI.quizId) + "maxNumberOfQuestions",
-             get_rPrefix(quizIdAPI.quizId) + "minMeasurementAccuracy",
-             get_rPrefix(quizIdAPI.quizId) + "inputProficiencyLevel",
-             get_rPrefix(quizIdAPI.quizId) + "questionSelector",
-             get_rPrefix(quizIdAPI.quizId) + "competencyEstimator",
-             get_rPrefix(quizIdAPI.quizId) + "standardErrorOfEstimation",
-             get_rPrefix(quizIdAPI.quizId) + "quizFinished",
-             get_rPrefix(quizIdAPI.quizId) + "minDiff",
-             get_rPrefix(quizIdAPI.quizId) + "maxDiff",
-             get_rPrefix(quizIdAPI.quizId) + "questions",
-             get_rPrefix(quizIdAPI.quizId) + "estTheta")
-    r.lrem("quizIds", 0, quizIdAPI.quizId)
+async def delete_quiz(quizIdAPI):
+    # UNLINK frees the memory in the background on the Redis server, both commands are sent with a single round-trip
+    pipe = r.pipeline(transaction=False)
+    pipe.unlink(get_rHashKey(quizIdAPI.quizId),
+                get_rPrefix(quizIdAPI.quizId) + "items_blob",
+                get_rPrefix(quizIdAPI.quizId) + "questionIds_blob",
+                get_rPrefix(quizIdAPI.quizId) + "administeredItems",
+                get_rPrefix(quizIdAPI.quizId) + "responses_blob")
+    pipe.srem("quizIdSet", quizIdAPI.quizId)
+    await pipe.execute()
     return
 
 
@@ -348,131 +404,104 @@ def get_rPrefix(quizId: int):  # Helper method to create the naming for the data
     return (str(quizId) + "_")
 
 
-def get_items(quizId: int):  # Helper method to load all questions into a catsim-usable np array
-    questionsJSON = r.lrange(get_rPrefix(quizId) + "questions", 0, r.llen(get_rPrefix(quizId) + "questions"))
-    items = np.empty([0, 4], float)  # contains all possible questions for the quiz in the catsim format
-    for questionJSON in questionsJSON:
-        questionParsed = json.loads(questionJSON)
-        items = np.append(items, [[questionParsed.get('discrimination'), questionParsed.get('difficulty'),
-                                   questionParsed.get('pseudoGuessing'), questionParsed.get('upperAsymptote')]], 0)
-    return items
+def get_rHashKey(quizId: int):  # Helper method to create the name of the hash containing all scalar values of a quiz
+    return ("quiz:" + str(quizId))
+
+
+def get_quizStateKeys(quizId: int):  # Helper method to list all keys read by the fetch_state script
+    return [get_rHashKey(quizId),
+            get_rPrefix(quizId) + "items_blob",
+            get_rPrefix(quizId) + "questionIds_blob",
+            get_rPrefix(quizId) + "administeredItems",
+            get_rPrefix(quizId) + "responses_blob"]
 
 
-def get_item_by_index(quizId: int, itemIndex: int):
-    items = get_items(quizId)
-    return (items[itemIndex])
+async def get_quizData(quizId: int):  # Helper method to load all scalar values of a quiz with a single call
+    return parse_quizData(await r.hgetall(get_rHashKey(quizId)))
 
 
-def get_questionIds(quizId: int):  # Helper method to load all questionIds into a list, so we can use the listindex to select the chosen question id
-    questionsJSON = r.lrange(get_rPrefix(quizId) + "questions", 0, r.llen(get_rPrefix(quizId) + "questions"))
-    questionIds = []  # contains all the real questionIds; maps to items via the index
-    for questionJSON in questionsJSON:
-        questionParsed = json.loads(questionJSON)
-        questionIds.append(questionParsed.get('id'))
+def parse_quizData(quizDataRaw: dict):
+    return {key.decode("utf-8"): value.decode("utf-8") for key, value in quizDataRaw.items()}
+
+
+def parse_items(itemsBlob: bytes):  # Helper method to convert an already fetched items blob into a catsim-usable np array
+    items = np.frombuffer(itemsBlob, dtype=np.float64).reshape(-1, 4)  # contains all possible questions for the quiz in the catsim format
+    return items
+
+
+def parse_questionIds(questionIdsBlob: bytes):
+    questionIds = np.frombuffer(questionIdsBlob, dtype=np.int64).tolist()  # contains all the real questionIds; maps to items via the index
     return questionIds
 
 
-def get_questionId_by_index(quizId: int, itemIndex: int):  # Helper method to retrieve a question id by its index
-    questionIds = get_questionIds(quizId)
-    return (questionIds[itemIndex])
+async def get_administeredItems(quizId: int):
+    administeredItemsJSON = await r.lrange(get_rPrefix(quizId) + "administeredItems", 0, -1)
+    return parse_administeredItems(administeredItemsJSON)
 
 
-def get_administeredItems(quizId: int):
-    administeredItemsJSON = r.lrange(get_rPrefix(quizId) + "administeredItems", 0, r.llen(get_rPrefix(quizId) + "administeredItems"))
-    administeredItems = np.empty([0, 1], int)
-    for administeredItemJSON in administeredItemsJSON:
-        administeredItems = np.append(administeredItems, int(administeredItemJSON))
+def parse_administeredItems(administeredItemsJSON: list):
+    administeredItems = np.fromiter((int(administeredItemJSON) for administeredItemJSON in administeredItemsJSON),
+                                    dtype=np.int64, count=len(administeredItemsJSON))
     return administeredItems
 
 
-def get_responses(quizId: int):
-    responsesJSON = r.lrange(get_rPrefix(quizId) + "responses", 0, r.llen(get_rPrefix(quizId) + "responses"))
-    responses = np.empty([0, 1], dtype=bool)  # contains the given answers for the administeredQuestions as boolean values (needed for the catsim library)
-    for responseJSON in responsesJSON:
-        if (float(responseJSON) == 1.0):
-            responses = np.append(responses, True)
-        else:
-            responses = np.append(responses, False)
+def parse_responses(responsesBlob: bytes):
+    responses = parse_responses_as_float(responsesBlob) == 1.0  # contains the given answers for the administeredQuestions as boolean values (needed for the catsim library)
     return responses
 
 
-def get_responses_as_float(quizId: int):
-    responsesJSON = r.lrange(get_rPrefix(quizId) + "responses", 0, r.llen(get_rPrefix(quizId) + "responses"))
-    responses = np.empty([0, 1], dtype=float)  # contains the given answers for the administeredQuestions as float values
-    for responseJSON in responsesJSON:
-        responses = np.append(responses, float(responseJSON))
-    return responses
+async def get_responses_as_float(quizId: int):
+    responsesBlob = await r.get(get_rPrefix(quizId) + "responses_blob")
+    return parse_responses_as_float(responsesBlob)
 
 
-def get_indices(quizId: int):  # Helper method for non-adaptive quizzes.
-    questions = get_items(quizId)
-    indices = []
-    i = 0
-    while i <= len(questions):
-        indices.append(i)
-        i = i + 1
-    return indices
+def parse_responses_as_float(responsesBlob: bytes):
+    responses = np.frombuffer(responsesBlob or b"", dtype=np.float64)  # contains the given answers for the administeredQuestions as float values
+    return responses
 
 
-def get_estimator(quizId: int):
-    competencyEstimator = r.get(get_rPrefix(quizId) + "competencyEstimator").decode("utf-8")
-    if competencyEstimator == "differentialEvolutionEstimator":
-        estimator = DifferentialEvolutionEstimator(
-            (float(r.get(get_rPrefix(quizId) + "minDiff")), float(r.get(get_rPrefix(quizId) + "maxDiff"))))
+# Selectors and estimators only depend on the configuration of a quiz, so they are created once and shared between quizzes
+@lru_cache(maxsize=1024)
+def get_estimator(competencyEstimator: str):
+    if competencyEstimator in ("hillClimbingEstimator", "differentialEvolutionEstimator"):  # differentialEvolutionEstimator is kept for existing clients, it was replaced since it is much slower
+        estimator = HillClimbingEstimator(dodd=True)  # dodd: keeps the estimation finite while all responses are either correct or incorrect
     return estimator
 
 
-def get_selector(quizId: int):
-    questionSelector = r.get(get_rPrefix(quizId) + "questionSelector").decode("utf-8")
+@lru_cache(maxsize=1024)
+def get_selector(questionSelector: str, numberOfQuestions: int):
     if questionSelector == 'maxInfoSelector':
         selector = MaxInfoSelector()
     elif questionSelector == 'linearSelector':
-        selector = LinearSelector(get_indices(quizId))
+        selector = LinearSelector(list(range(numberOfQuestions)))  # non-adaptive quizzes deliver all questions in the given order
     return (selector)
 
 
-def quizIdExists(quizId: int):
-    quizIdsJSON = r.lrange("quizIds", 0, r.llen("quizIds"))
-    for quizIdJSON in quizIdsJSON:
-        if (int(quizIdJSON) == quizId):
-            return True
-    return False
+async def quizIdExists(quizId: int):
+    return bool(await r.sismember("quizIdSet", quizId))
 
 
 # INIT Methods for CAT-SIM Objects
-def init_estimator(quizAPI: QuizAPI):
-    if quizAPI.competencyEstimator == 'differentialEvolutionEstimator':
-        minInColumns = numpy.amin(get_items(quizAPI.quizId), axis=0)
-        minDiff = minInColumns[1]
-        maxInColumns = numpy.amax(get_items(quizAPI.quizId), axis=0)
-        maxDiff = maxInColumns[1]
-        r.mset({get_rPrefix(quizAPI.quizId) + "minDiff": minDiff,
-                get_rPrefix(quizAPI.quizId) + "maxDiff": maxDiff
-                })
-    # could implement other estimators with other parameters
-    return
-
-
-def init_selector(quizAPI: QuizAPI):
+def init_selector(quizAPI: QuizAPI, pipe):
     # this implements: going through all questions in the given order and stop after the last one (because minMeasurementAccuracy=0)
     if quizAPI.questionSelector == 'linearSelector':
         quizAPI.maxNumberOfQuestions = len(quizAPI.questions)
-        r.set(get_rPrefix(quizAPI.quizId) + "maxNumberOfQuestions",
-              len(quizAPI.questions))  # a classic quiz will stop after all its items are delivered
+        pipe.hset(get_rHashKey(quizAPI.quizId), "maxNumberOfQuestions",
+                  len(quizAPI.questions))  # a classic quiz will stop after all its items are delivered
         quizAPI.minMeasurementAccuracy = 0.0
-        r.set(get_rPrefix(quizAPI.quizId) + "minMeasurementAccuracy",
-              0.0)  # Is set to 0.0 since a non-adaptive quiz should display all questions
+        pipe.hset(get_rHashKey(quizAPI.quizId), "minMeasurementAccuracy",
+                  0.0)  # Is set to 0.0 since a non-adaptive quiz should display all questions
         quizAPI.competencyEstimator = "linearEstimator"
     # could implement other selectors with other parameters
     return
 
 
-def init_initializer(quizAPI: QuizAPI):
+def init_initializer(quizAPI: QuizAPI, pipe):
     if quizAPI.inputProficiencyLevel == 99.9: # 99.9: magic value to initialize with random proficiency
         initializer = RandomInitializer()  # Initialize quiz with random proficiency level
     else:
         initializer = FixedPointInitializer(
             quizAPI.inputProficiencyLevel)  # Initialize quiz with given proficiency level
     currentProficiencyLevel = initializer.initialize()
-    r.set(get_rPrefix(quizAPI.quizId) + "estTheta", currentProficiencyLevel)
+    pipe.hset(get_rHashKey(quizAPI.quizId), "estTheta", currentProficiencyLevel)
     return